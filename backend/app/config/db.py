@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine
 from dotenv import load_dotenv
 
@@ -12,4 +14,8 @@ POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD')
 
 url = f'postgresql+psycopg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}'
 
-engine = create_engine(url)
\ No newline at end of file
+
+@lru_cache
+def get_engine() -> Engine:
+    # se crea en el primer uso (lifespan o primera petición), no al importar el módulo
+    return create_engine(url)
@@ -0,0 +1,13 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SINGLEFLIGHT_TTL = float(os.getenv('SINGLEFLIGHT_TTL', '0'))
+LEDGER_CHECKPOINT_INTERVAL = int(os.getenv('LEDGER_CHECKPOINT_INTERVAL', '100'))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+PROFILING_SECRET = os.getenv('PROFILING_SECRET')
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_BUFFER_SIZE = int(os.getenv('PROFILING_BUFFER_SIZE', '20'))
+DB_CREATE_ALL = os.getenv('DB_CREATE_ALL', 'true').lower() in ('1', 'true', 'yes')
+STARTUP_WARMUP = os.getenv('STARTUP_WARMUP', 'false').lower() in ('1', 'true', 'yes')
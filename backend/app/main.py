@@ -1,16 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
-from app.config.db import engine
+from app.services.startup import FirstRequestTimer, create_tables, mark_ready, warm_up
+from app.config.db import get_engine
+from app.config.settings import DB_CREATE_ALL, PROFILING_SAMPLE_RATE, PROFILING_SECRET, STARTUP_WARMUP
 from app import models
+from app.routes.admin import admin_router
 from app.routes.criptomoneda import criptomoneda_router
+from app.routes.health import health_router
 from app.routes.transacciones import router as transacciones_router
 from app.routes.usuario import usuario_router
 from app.routes.wallet import router as wallet_router
+from app.utils.profiling import ProfilingMiddleware, profile_store
 
-SQLModel.metadata.create_all(engine)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    if DB_CREATE_ALL:
+        create_tables(get_engine())
+    if STARTUP_WARMUP:
+        warm_up(get_engine())
+    app.state.ready = True
+    mark_ready()
+    yield
+    app.state.ready = False
+    get_engine().dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  
@@ -18,8 +36,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    secret=PROFILING_SECRET,
+    sample_rate=PROFILING_SAMPLE_RATE,
+)
+app.add_middleware(FirstRequestTimer)
 
+app.include_router(health_router)
 app.include_router(criptomoneda_router)
 app.include_router(transacciones_router)
 app.include_router(usuario_router)
 app.include_router(wallet_router)
+app.include_router(admin_router)
@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from enum import Enum
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DECIMAL, func, DateTime
+from sqlalchemy import Column, DECIMAL, func, DateTime, Index, UniqueConstraint
 from pydantic import EmailStr
 
 
@@ -183,4 +183,56 @@ class TransactionFilter(SQLModel):
     usuario_id: Optional[int] = None
     cryptomoneda_id: Optional[int] = None
     tipo: Optional[TransactionType] = None
-    estado: Optional[TransactionStatus] = None
\ No newline at end of file
+    estado: Optional[TransactionStatus] = None
+
+
+class LedgerEntryType(str, Enum):
+    Debit = "Debit"
+    Credit = "Credit"
+
+
+class LedgerEntry(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_ledgerentry_wallet_id_id", "wallet_id", "id"),
+        UniqueConstraint("transaction_id", "wallet_id", "tipo", name="uq_ledgerentry_transaction_wallet_tipo"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    wallet_id: int = Field(foreign_key="wallet.id")
+    transaction_id: Optional[int] = Field(default=None, foreign_key="transaction.id", index=True)
+    tipo: LedgerEntryType
+    cantidad: Decimal = Field(sa_column=Column(DECIMAL(precision=18, scale=8), nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LedgerEntryRead(SQLModel):
+    id: int
+    wallet_id: int
+    transaction_id: Optional[int] = None
+    tipo: LedgerEntryType
+    cantidad: Decimal
+    created_at: datetime
+
+
+class LedgerOpening(SQLModel, table=True):
+    wallet_id: int = Field(foreign_key="wallet.id", primary_key=True)
+    ledger_entry_id: Optional[int] = Field(default=None, foreign_key="ledgerentry.id")
+    saldo: Decimal = Field(sa_column=Column(DECIMAL(precision=18, scale=8), nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BalanceCheckpoint(SQLModel, table=True):
+    __table_args__ = (Index("ix_balancecheckpoint_wallet_id_ledger_entry_id", "wallet_id", "ledger_entry_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    wallet_id: int = Field(foreign_key="wallet.id")
+    ledger_entry_id: int = Field(foreign_key="ledgerentry.id")
+    balance: Decimal = Field(sa_column=Column(DECIMAL(precision=18, scale=8), nullable=False))
+    as_of: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class WalletBalance(SQLModel):
+    wallet_id: int
+    balance: Decimal
+    as_of: Optional[datetime] = None
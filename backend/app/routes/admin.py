@@ -0,0 +1,44 @@
+import hmac
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from app.config.db import get_engine
+from app.config.settings import ADMIN_TOKEN
+from app.services.ledger import verify_wallets
+from app.utils.profiling import profile_store
+from app.utils.singleflight import all_stats
+
+
+def require_admin_token(x_admin_token: Annotated[Optional[str], Header()] = None):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Administración deshabilitada")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+
+admin_router = APIRouter(prefix="/api/admin", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+
+
+@admin_router.get("/singleflight")
+def get_singleflight_stats():
+    return all_stats()
+
+
+@admin_router.get("/ledger/verify")
+def verify_ledger(
+    chunk_size: Annotated[int, Query(ge=1, le=10000)] = 500,
+    workers: Annotated[int, Query(ge=1, le=16)] = 4,
+):
+    return verify_wallets(get_engine(), chunk_size=chunk_size, workers=workers)
+
+
+@admin_router.get("/profiles")
+def get_profiles():
+    return profile_store.list()
+
+
+@admin_router.get("/profiles/{profile_id}")
+def get_profile(profile_id: int):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return profile.detail()
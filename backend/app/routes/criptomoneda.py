@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from app.models.item import Cryptomoneda, CryptomonedaBase
 from app.routes.deps.db_session import SessionDep
+from app.config.settings import SINGLEFLIGHT_TTL
+from app.utils.singleflight import get_flight
+from app.utils.profiling import ProfiledRoute
 from sqlmodel import select
 
 
-criptomoneda_router = APIRouter(prefix="/api/criptomonedas", tags=["Criptomonedas"])
+criptomoneda_router = APIRouter(prefix="/api/criptomonedas", tags=["Criptomonedas"], route_class=ProfiledRoute)
+criptomoneda_flight = get_flight("get_criptomoneda", ttl=SINGLEFLIGHT_TTL)
 
 @criptomoneda_router.get("/", response_model=list[Cryptomoneda])
 def get_criptomonedas(db: SessionDep):
@@ -13,7 +17,7 @@ def get_criptomonedas(db: SessionDep):
 
 @criptomoneda_router.get("/{criptomoneda_id}", response_model=Cryptomoneda)
 def get_criptomoneda(criptomoneda_id: int, db: SessionDep):
-    criptomoneda = db.get(Cryptomoneda, criptomoneda_id)
+    criptomoneda = criptomoneda_flight.do(criptomoneda_id, lambda: db.get(Cryptomoneda, criptomoneda_id))
     if not criptomoneda:
         raise HTTPException(status_code=404, detail="Criptomoneda no encontrada")
     return criptomoneda
@@ -32,4 +36,5 @@ def delete_criptomoneda(criptomoneda_id: int, db: SessionDep):
     if not criptomoneda:
         raise HTTPException(status_code=404, detail="Criptomoneda no encontrada")
     db.delete(criptomoneda)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    criptomoneda_flight.forget(criptomoneda_id)
\ No newline at end of file
@@ -1,10 +1,10 @@
 from typing import Annotated, Generator
 from fastapi import Depends
 from sqlmodel import Session
-from app.config.db import engine
+from app.config.db import get_engine
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
 
 
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy import text
+from app.config.db import get_engine
+from app.services.startup import startup_metrics
+
+health_router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@health_router.get("/live")
+def liveness():
+    return {"status": "ok"}
+
+
+@health_router.get("/ready")
+def readiness(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="La aplicación está arrancando")
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Base de datos no disponible")
+    return {"status": "ready", "startup": startup_metrics.as_dict()}
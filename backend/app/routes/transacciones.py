@@ -1,13 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 from typing import Annotated, List, Optional
 from app.models.item import Transaction, TransactionCreate, TransactionRead, TransactionUpdate, TransactionStatus, TransactionType, User
 from datetime import datetime
 from decimal import Decimal
 from app.routes.deps.db_session import SessionDep
 from app.routes.usuario import get_current_user
+from app.services.ledger import LedgerError, has_entries, post_transaction, validate_transaction
+from app.utils.singleflight import get_flight
+from app.utils.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/api/transacciones", tags=["Transacciones"])
+router = APIRouter(prefix="/api/transacciones", tags=["Transacciones"], route_class=ProfiledRoute)
+wallet_flight = get_flight("obtener_wallet")
+
+
+def _validar_cambio_estado(transaction: Transaction, nuevo_estado: TransactionStatus, db: Session) -> bool:
+    """Bloquea la transacción y valida el cambio; devuelve True si hay que registrarla en el ledger."""
+    db.refresh(transaction, with_for_update=True)
+    anterior = transaction.estado
+    if nuevo_estado == anterior:
+        return False
+    if anterior == TransactionStatus.Completed:
+        raise HTTPException(status_code=400, detail="Una transacción completada no puede cambiar de estado")
+    if nuevo_estado == TransactionStatus.Completed and anterior != TransactionStatus.Pending:
+        raise HTTPException(status_code=400, detail="Sólo una transacción pendiente puede completarse")
+    return nuevo_estado == TransactionStatus.Completed
+
+
+def _registrar_en_ledger(transaction: Transaction, db: Session):
+    try:
+        post_transaction(db, transaction)
+    except LedgerError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="La transacción ya está registrada en el ledger")
+
+
+def _olvidar_wallets(transaction: Transaction):
+    for wallet_id in (transaction.wallet_origen_id, transaction.wallet_destino_id):
+        if wallet_id is not None:
+            wallet_flight.forget(wallet_id)
 
 
 @router.post("/", response_model=TransactionRead, status_code=201)
@@ -28,6 +63,11 @@ def create_transaction(
         estado=TransactionStatus.Pending
     )
 
+    try:
+        validate_transaction(db, db_transaction)
+    except LedgerError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     if transaction.precio_unitario:
         db_transaction.total_usd = transaction.cantidad * transaction.precio_unitario
 
@@ -87,6 +127,10 @@ def actualizar_transaccion(
     if transaction.usuario_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para actualizar esta transacción")
     
+    registrar = False
+    if transaction_update.estado is not None:
+        registrar = _validar_cambio_estado(transaction, transaction_update.estado, db)
+    
     transaccion_data = transaction_update.dict(exclude_unset=True)
     for key, value in transaccion_data.items():
         setattr(transaction, key, value)
@@ -95,8 +139,11 @@ def actualizar_transaccion(
         transaction.completed_at = datetime.utcnow()
 
     db.add(transaction)
+    if registrar:
+        _registrar_en_ledger(transaction, db)
     db.commit()
     db.refresh(transaction)
+    _olvidar_wallets(transaction)
     return transaction
 
 
@@ -135,14 +182,18 @@ def cambiar_estado_transaccion(
     if transaccion.usuario_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para cambiar el estado de esta transacción")
     
+    registrar = _validar_cambio_estado(transaccion, nuevo_estado, db)
     transaccion.estado = nuevo_estado
     
     if nuevo_estado == TransactionStatus.Completed:
         transaccion.completed_at = datetime.utcnow()
     
     db.add(transaccion)
+    if registrar:
+        _registrar_en_ledger(transaccion, db)
     db.commit()
     db.refresh(transaccion)
+    _olvidar_wallets(transaccion)
     return transaccion
 
 
@@ -159,5 +210,8 @@ def delete_transaction(
     if transaction.usuario_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para eliminar esta transacción")
     
+    if has_entries(db, transaction_id=transaction_id):
+        raise HTTPException(status_code=400, detail="No se puede eliminar una transacción registrada en el ledger")
+    
     db.delete(transaction)
     db.commit()
\ No newline at end of file
@@ -6,6 +6,9 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.models.item import User, UserCreate, UserRead, UserUpdate, UserProfile
 from app.routes.deps.db_session import SessionDep
+from app.config.settings import SINGLEFLIGHT_TTL
+from app.utils.singleflight import get_flight
+from app.utils.profiling import ProfiledRoute
 from sqlmodel import select
 
 from app.routes.deps.auth_session import get_current_user
@@ -17,7 +20,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 15
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/usuarios/login")
 
-usuario_router = APIRouter(prefix="/api/usuarios", tags=["Usuarios"])
+usuario_router = APIRouter(prefix="/api/usuarios", tags=["Usuarios"], route_class=ProfiledRoute)
+user_flight = get_flight("get_user", ttl=SINGLEFLIGHT_TTL)
 
 
 def hash_password(password: str) -> str:
@@ -97,7 +101,7 @@ def get_my_profile(current_user: Annotated[User, Depends(get_current_user)]):
 
 @usuario_router.get("/{user_id}", response_model=UserProfile)
 def get_user(user_id: int, db: SessionDep):
-    user = db.get(User, user_id)
+    user = user_flight.do(user_id, lambda: db.get(User, user_id))
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     if not user.is_active:
@@ -137,6 +141,7 @@ def update_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    user_flight.forget(user_id)
     return user
 
 
@@ -155,6 +160,7 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    user_flight.forget(user_id)
 
 
 @usuario_router.post("/logout", status_code=200)
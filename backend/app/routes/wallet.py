@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from typing import Annotated, List, Optional
-from app.config.db import engine
-from app.models.item import Wallet, WalletBase, User, Cryptomoneda
+from datetime import datetime
+from app.models.item import Wallet, WalletBase, User, Cryptomoneda, LedgerEntry, LedgerEntryRead, LedgerOpening, WalletBalance
 from app.routes.deps.db_session import SessionDep
 from app.routes.usuario import get_current_user
+from app.utils.singleflight import get_flight
+from app.utils.profiling import ProfiledRoute
+from app.services.ledger import get_balance, has_entries
 
-router = APIRouter(prefix="/api/wallets", tags=["Wallets"])
+router = APIRouter(prefix="/api/wallets", tags=["Wallets"], route_class=ProfiledRoute)
+# sin micro-cache: el saldo lo mueve el ledger y no debe servirse desfasado
+wallet_flight = get_flight("obtener_wallet", ttl=0)
 
 
 @router.post("/", response_model=Wallet, status_code=201)
@@ -67,12 +72,36 @@ def obtener_wallets(
 
 @router.get("/{wallet_id}", response_model=Wallet)
 def obtener_wallet(wallet_id: int, db: SessionDep):
-    wallet = db.get(Wallet, wallet_id)
+    wallet = wallet_flight.do(wallet_id, lambda: db.get(Wallet, wallet_id))
     if not wallet:
         raise HTTPException(status_code=404, detail="Wallet no encontrada")
     return wallet
 
 
+@router.get("/{wallet_id}/balance", response_model=WalletBalance)
+def obtener_balance_wallet(wallet_id: int, db: SessionDep, at: Optional[datetime] = Query(None)):
+    wallet = db.get(Wallet, wallet_id)
+    if not wallet:
+        raise HTTPException(status_code=404, detail="Wallet no encontrada")
+    return get_balance(db, wallet_id, at)
+
+
+@router.get("/{wallet_id}/ledger", response_model=List[LedgerEntryRead])
+def obtener_ledger_wallet(wallet_id: int, db: SessionDep, skip: int = 0, limit: int = 100):
+    wallet = db.get(Wallet, wallet_id)
+    if not wallet:
+        raise HTTPException(status_code=404, detail="Wallet no encontrada")
+    
+    query = (
+        select(LedgerEntry)
+        .where(LedgerEntry.wallet_id == wallet_id)
+        .order_by(LedgerEntry.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.exec(query).all()
+
+
 @router.put("/{wallet_id}", response_model=Wallet)
 def actualizar_wallet(
     wallet_id: int,
@@ -94,6 +123,7 @@ def actualizar_wallet(
     db.add(wallet)
     db.commit()
     db.refresh(wallet)
+    wallet_flight.forget(wallet_id)
     return wallet
 
 
@@ -110,8 +140,16 @@ def eliminar_wallet(
     if wallet.usuario_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para eliminar esta wallet")
     
+    if has_entries(db, wallet_id=wallet_id):
+        raise HTTPException(status_code=400, detail="No se puede eliminar una wallet con movimientos en el ledger")
+    
+    # sin movimientos, la marca del bootstrap es de una apertura a cero
+    opening = db.get(LedgerOpening, wallet_id)
+    if opening:
+        db.delete(opening)
     db.delete(wallet)
     db.commit()
+    wallet_flight.forget(wallet_id)
 
 
 @router.get("/usuario/{usuario_id}", response_model=List[Wallet])
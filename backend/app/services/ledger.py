@@ -0,0 +1,315 @@
+"""Ledger de solo-anexar para los saldos de las wallets.
+
+Cada movimiento es un ``LedgerEntry`` (débito o crédito) y cada
+``LEDGER_CHECKPOINT_INTERVAL`` movimientos se guarda un ``BalanceCheckpoint``.
+El saldo de una wallet, actual o en un instante dado, es el último checkpoint
+más la cola corta de movimientos posteriores. ``Wallet.balance`` se mantiene
+como copia materializada y ``verify_wallets`` la concilia contra el ledger.
+
+    python -m app.services.ledger --chunk-size 500 --workers 4
+    python -m app.services.ledger --bootstrap
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, event, func
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.config.settings import LEDGER_CHECKPOINT_INTERVAL
+from app.models.item import (
+    BalanceCheckpoint,
+    LedgerEntry,
+    LedgerEntryType,
+    LedgerOpening,
+    Transaction,
+    TransactionType,
+    Wallet,
+    WalletBalance,
+)
+
+ZERO = Decimal("0")
+
+
+class LedgerError(Exception):
+    pass
+
+
+def _reject_mutation(mapper, connection, target):
+    raise LedgerError("El ledger es de solo-anexar: los movimientos no se modifican ni se eliminan")
+
+
+event.listen(LedgerEntry, "before_update", _reject_mutation)
+event.listen(LedgerEntry, "before_delete", _reject_mutation)
+
+
+def _signed():
+    return case((LedgerEntry.tipo == LedgerEntryType.Debit, -LedgerEntry.cantidad), else_=LedgerEntry.cantidad)
+
+
+def _naive_utc(at: Optional[datetime]) -> Optional[datetime]:
+    if at is not None and at.tzinfo is not None:
+        return at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+def _last_checkpoint(db: Session, wallet_id: int, at: Optional[datetime] = None) -> Optional[BalanceCheckpoint]:
+    query = select(BalanceCheckpoint).where(BalanceCheckpoint.wallet_id == wallet_id)
+    if at is not None:
+        query = query.where(BalanceCheckpoint.as_of <= at)
+    query = query.order_by(BalanceCheckpoint.ledger_entry_id.desc()).limit(1)
+    return db.exec(query).first()
+
+
+def get_balance(db: Session, wallet_id: int, at: Optional[datetime] = None) -> WalletBalance:
+    at = _naive_utc(at)
+    checkpoint = _last_checkpoint(db, wallet_id, at)
+
+    tail = select(func.coalesce(func.sum(_signed()), ZERO)).where(LedgerEntry.wallet_id == wallet_id)
+    if checkpoint is not None:
+        tail = tail.where(LedgerEntry.id > checkpoint.ledger_entry_id)
+    if at is not None:
+        tail = tail.where(LedgerEntry.created_at <= at)
+
+    base = checkpoint.balance if checkpoint is not None else ZERO
+    return WalletBalance(wallet_id=wallet_id, balance=base + db.exec(tail).one(), as_of=at)
+
+
+def _lock_wallets(db: Session, wallet_ids: List[int]) -> Dict[int, Wallet]:
+    # siempre en orden ascendente de id para que A→B y B→A concurrentes no se bloqueen mutuamente
+    wallets = {}
+    for wallet_id in sorted(set(wallet_ids)):
+        wallet = db.exec(select(Wallet).where(Wallet.id == wallet_id).with_for_update()).first()
+        if wallet is None:
+            raise LedgerError(f"Wallet {wallet_id} no encontrada")
+        wallets[wallet_id] = wallet
+    return wallets
+
+
+def _append(
+    db: Session,
+    wallet: Wallet,
+    tipo: LedgerEntryType,
+    cantidad: Decimal,
+    transaction_id: Optional[int] = None,
+) -> LedgerEntry:
+    """Anexa un movimiento a una wallet que el llamador ya tiene bloqueada."""
+    if cantidad <= 0:
+        raise LedgerError("La cantidad de un movimiento debe ser positiva")
+
+    delta = -cantidad if tipo == LedgerEntryType.Debit else cantidad
+    balance = (wallet.balance or ZERO) + delta
+    if balance < 0:
+        raise LedgerError(f"Saldo insuficiente en la wallet {wallet.id}")
+
+    entry = LedgerEntry(wallet_id=wallet.id, transaction_id=transaction_id, tipo=tipo, cantidad=cantidad)
+    db.add(entry)
+    wallet.balance = balance
+    db.add(wallet)
+    db.flush()
+
+    checkpoint = _last_checkpoint(db, wallet.id)
+    since = select(func.count()).select_from(LedgerEntry).where(LedgerEntry.wallet_id == wallet.id)
+    if checkpoint is not None:
+        since = since.where(LedgerEntry.id > checkpoint.ledger_entry_id)
+    if db.exec(since).one() >= LEDGER_CHECKPOINT_INTERVAL:
+        db.add(BalanceCheckpoint(
+            wallet_id=wallet.id,
+            ledger_entry_id=entry.id,
+            balance=get_balance(db, wallet.id).balance,
+            as_of=entry.created_at,
+        ))
+        db.flush()
+    return entry
+
+
+def append_entry(
+    db: Session,
+    wallet_id: int,
+    tipo: LedgerEntryType,
+    cantidad: Decimal,
+    transaction_id: Optional[int] = None,
+) -> LedgerEntry:
+    wallet = _lock_wallets(db, [wallet_id])[wallet_id]
+    return _append(db, wallet, tipo, cantidad, transaction_id)
+
+
+def _check_wallets(transaction: Transaction, origen: Optional[Wallet], destino: Optional[Wallet]) -> None:
+    if transaction.tipo == TransactionType.Transfer:
+        if transaction.wallet_origen_id is None or transaction.wallet_destino_id is None:
+            raise LedgerError("Una transferencia necesita wallet de origen y de destino")
+    if transaction.wallet_origen_id is not None:
+        if origen is None:
+            raise LedgerError(f"Wallet {transaction.wallet_origen_id} no encontrada")
+        if origen.usuario_id != transaction.usuario_id:
+            raise LedgerError("La wallet de origen no pertenece al usuario de la transacción")
+    if transaction.wallet_destino_id is not None and destino is None:
+        raise LedgerError(f"Wallet {transaction.wallet_destino_id} no encontrada")
+    for wallet in (origen, destino):
+        if wallet is not None and wallet.cryptomoneda_id != transaction.cryptomoneda_id:
+            raise LedgerError(f"La wallet {wallet.id} no es de la criptomoneda de la transacción")
+
+
+def validate_transaction(db: Session, transaction: Transaction) -> None:
+    """Comprueba que las wallets de la transacción existen, son del usuario y de la misma criptomoneda."""
+    origen = db.get(Wallet, transaction.wallet_origen_id) if transaction.wallet_origen_id is not None else None
+    destino = db.get(Wallet, transaction.wallet_destino_id) if transaction.wallet_destino_id is not None else None
+    _check_wallets(transaction, origen, destino)
+
+
+def post_transaction(db: Session, transaction: Transaction) -> List[LedgerEntry]:
+    """Registra el débito de la wallet origen y el crédito de la destino; es idempotente."""
+    # la fila de la transacción serializa completados concurrentes antes de comprobar si ya se registró
+    db.exec(select(Transaction.id).where(Transaction.id == transaction.id).with_for_update()).first()
+    if has_entries(db, transaction_id=transaction.id):
+        return []
+
+    movimientos = []
+    if transaction.wallet_origen_id is not None:
+        movimientos.append((transaction.wallet_origen_id, LedgerEntryType.Debit))
+    if transaction.wallet_destino_id is not None:
+        movimientos.append((transaction.wallet_destino_id, LedgerEntryType.Credit))
+
+    wallets = _lock_wallets(db, [wallet_id for wallet_id, _ in movimientos])
+    _check_wallets(
+        transaction,
+        wallets.get(transaction.wallet_origen_id),
+        wallets.get(transaction.wallet_destino_id),
+    )
+    return [
+        _append(db, wallets[wallet_id], tipo, transaction.cantidad, transaction.id)
+        for wallet_id, tipo in movimientos
+    ]
+
+
+def has_entries(db: Session, wallet_id: Optional[int] = None, transaction_id: Optional[int] = None) -> bool:
+    query = select(LedgerEntry.id)
+    if wallet_id is not None:
+        query = query.where(LedgerEntry.wallet_id == wallet_id)
+    if transaction_id is not None:
+        query = query.where(LedgerEntry.transaction_id == transaction_id)
+    return db.exec(query.limit(1)).first() is not None
+
+
+def _verify_chunk(engine: Engine, wallet_ids: List[int]) -> List[dict]:
+    with Session(engine) as db:
+        totals = dict(db.exec(
+            select(LedgerEntry.wallet_id, func.sum(_signed()))
+            .where(LedgerEntry.wallet_id.in_(wallet_ids))
+            .group_by(LedgerEntry.wallet_id)
+        ).all())
+        balances = dict(db.exec(select(Wallet.id, Wallet.balance).where(Wallet.id.in_(wallet_ids))).all())
+
+        latest = (
+            select(BalanceCheckpoint.wallet_id, func.max(BalanceCheckpoint.ledger_entry_id).label("entry_id"))
+            .where(BalanceCheckpoint.wallet_id.in_(wallet_ids))
+            .group_by(BalanceCheckpoint.wallet_id)
+            .subquery()
+        )
+        checkpoints = dict(db.exec(
+            select(BalanceCheckpoint.wallet_id, BalanceCheckpoint.balance).join(
+                latest,
+                and_(
+                    BalanceCheckpoint.wallet_id == latest.c.wallet_id,
+                    BalanceCheckpoint.ledger_entry_id == latest.c.entry_id,
+                ),
+            )
+        ).all())
+        tails = dict(db.exec(
+            select(LedgerEntry.wallet_id, func.sum(_signed()))
+            .outerjoin(latest, LedgerEntry.wallet_id == latest.c.wallet_id)
+            .where(LedgerEntry.wallet_id.in_(wallet_ids), LedgerEntry.id > func.coalesce(latest.c.entry_id, 0))
+            .group_by(LedgerEntry.wallet_id)
+        ).all())
+
+        drift = []
+        for wallet_id in wallet_ids:
+            ledger = totals.get(wallet_id) or ZERO
+            balance = balances.get(wallet_id) or ZERO
+            from_checkpoint = (checkpoints.get(wallet_id) or ZERO) + (tails.get(wallet_id) or ZERO)
+            if balance != ledger or from_checkpoint != ledger:
+                drift.append({
+                    "wallet_id": wallet_id,
+                    "balance": balance,
+                    "ledger": ledger,
+                    "checkpoint": from_checkpoint,
+                    "drift": balance - ledger,
+                })
+        return drift
+
+
+def verify_wallets(engine: Engine, chunk_size: int = 500, workers: int = 4) -> dict:
+    if chunk_size < 1 or workers < 1:
+        raise ValueError("chunk_size y workers deben ser al menos 1")
+    with Session(engine) as db:
+        wallet_ids = list(db.exec(select(Wallet.id).order_by(Wallet.id)).all())
+
+    chunks = [wallet_ids[i:i + chunk_size] for i in range(0, len(wallet_ids), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        drift = [row for rows in pool.map(lambda chunk: _verify_chunk(engine, chunk), chunks) for row in rows]
+
+    return {"wallets": len(wallet_ids), "chunks": len(chunks), "drift": drift}
+
+
+def bootstrap_opening_balances(engine: Engine) -> int:
+    """Crea el movimiento de apertura de cada wallet cuyo saldo no está cubierto por el ledger.
+
+    La apertura es ``balance - suma de movimientos``, así que también cubre las
+    wallets que ya recibieron movimientos antes de ejecutar el bootstrap. Cada
+    wallet abierta queda marcada en ``LedgerOpening``, también si la apertura es
+    cero, así que se abre una sola vez y el drift que aparezca después no se
+    absorbe. Devuelve cuántos movimientos de apertura se crearon.
+    """
+    created = 0
+    with Session(engine) as db:
+        opened = select(LedgerOpening.wallet_id)
+        wallet_ids = db.exec(select(Wallet.id).where(~Wallet.id.in_(opened)).order_by(Wallet.id)).all()
+        for wallet_id in wallet_ids:
+            wallet = _lock_wallets(db, [wallet_id])[wallet_id]
+            total, first = db.exec(
+                select(func.coalesce(func.sum(_signed()), ZERO), func.min(LedgerEntry.created_at))
+                .where(LedgerEntry.wallet_id == wallet_id)
+            ).one()
+            opening = (wallet.balance or ZERO) - total
+            marker = LedgerOpening(wallet_id=wallet_id, saldo=opening)
+            if opening != 0:
+                # fechada con el primer movimiento para que los saldos históricos la incluyan
+                entry = LedgerEntry(
+                    wallet_id=wallet_id,
+                    tipo=LedgerEntryType.Credit if opening > 0 else LedgerEntryType.Debit,
+                    cantidad=abs(opening),
+                    created_at=first or datetime.utcnow(),
+                )
+                db.add(entry)
+                db.flush()
+                marker.ledger_entry_id = entry.id
+                created += 1
+            db.add(marker)
+        db.commit()
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conciliación del ledger de wallets")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--bootstrap", action="store_true", help="crear créditos de apertura antes de verificar")
+    args = parser.parse_args()
+
+    from app.config.db import get_engine
+
+    engine = get_engine()
+
+    if args.bootstrap:
+        print(f"créditos de apertura: {bootstrap_opening_balances(engine)}")
+    result = verify_wallets(engine, chunk_size=args.chunk_size, workers=args.workers)
+    print(f"wallets: {result['wallets']}  chunks: {result['chunks']}  con drift: {len(result['drift'])}")
+    for row in result["drift"]:
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
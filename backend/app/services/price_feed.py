@@ -0,0 +1,319 @@
+"""Ingesta de ticks de precio con actualización masiva de ``Cryptomoneda.valor_usd``.
+
+Los ticks llegan de una fuente intercambiable (archivo, socket TCP o simulador),
+se agrupan por símbolo dentro de una ventana de flush y se aplican con un único
+``UPDATE ... FROM (VALUES ...)`` por ventana.
+
+El ingestor corre en su propio proceso, así que no puede invalidar el
+micro-cache de single-flight de los workers de la API: con
+``SINGLEFLIGHT_TTL > 0``, ``GET /api/criptomonedas/{id}`` puede servir un
+precio con hasta ``SINGLEFLIGHT_TTL`` segundos de retraso sobre la base de datos.
+
+    python -m app.services.price_feed simulate --symbols BTC,ETH --rate 5000
+    python -m app.services.price_feed file ticks.csv --window 0.5
+    python -m app.services.price_feed tcp localhost:9000
+"""
+import argparse
+import logging
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import DECIMAL, String, column, update, values
+from sqlalchemy.engine import Engine
+
+from app.models.item import Cryptomoneda
+
+logger = logging.getLogger(__name__)
+
+# DECIMAL(18, 8): como mucho 10 dígitos enteros
+MAX_VALOR_USD = Decimal("1e10")
+
+
+@dataclass
+class PriceTick:
+    simbolo: str
+    valor_usd: Decimal
+    ts: float
+
+
+def parse_tick(line: str) -> Optional[PriceTick]:
+    parts = [p.strip() for p in line.strip().split(",")]
+    if len(parts) < 2 or not parts[0] or parts[0].startswith("#"):
+        return None
+    try:
+        valor = Decimal(parts[1])
+        ts = float(parts[2]) if len(parts) > 2 and parts[2] else time.time()
+    except (InvalidOperation, ValueError):
+        return None
+    if not valor.is_finite() or not 0 < valor < MAX_VALOR_USD or ts != ts:
+        return None
+    return PriceTick(simbolo=parts[0], valor_usd=valor, ts=ts)
+
+
+class TickSource:
+    def __iter__(self) -> Iterator[PriceTick]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class FileTickSource(TickSource):
+    """Lee líneas ``SIMBOLO,precio[,timestamp]``; con ``follow`` sigue el archivo como ``tail -f``."""
+
+    def __init__(self, path: str, follow: bool = False):
+        self.path = path
+        self.follow = follow
+        self._closed = False
+
+    def __iter__(self) -> Iterator[PriceTick]:
+        with open(self.path, encoding="utf-8") as fh:
+            while not self._closed:
+                line = fh.readline()
+                if not line:
+                    if not self.follow:
+                        return
+                    time.sleep(0.05)
+                    continue
+                tick = parse_tick(line)
+                if tick is not None:
+                    yield tick
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class SocketTickSource(TickSource):
+    """Lee el mismo formato de líneas desde una conexión TCP."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._sock: Optional[socket.socket] = None
+
+    def __iter__(self) -> Iterator[PriceTick]:
+        self._sock = socket.create_connection((self.host, self.port))
+        with self._sock.makefile("r", encoding="utf-8") as fh:
+            for line in fh:
+                tick = parse_tick(line)
+                if tick is not None:
+                    yield tick
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+
+
+class SimulatedTickSource(TickSource):
+    """Paseo aleatorio de precios para ``rate`` ticks por segundo repartidos entre los símbolos."""
+
+    def __init__(self, simbolos: List[str], rate: float = 1000.0, limit: Optional[int] = None):
+        self.precios = {s: Decimal("100") for s in simbolos}
+        self.rate = rate
+        self.limit = limit
+        self._closed = False
+
+    def __iter__(self) -> Iterator[PriceTick]:
+        simbolos = list(self.precios)
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        next_at = time.monotonic()
+        emitted = 0
+        while not self._closed and (self.limit is None or emitted < self.limit):
+            simbolo = random.choice(simbolos)
+            precio = self.precios[simbolo] * Decimal(str(1 + random.uniform(-0.001, 0.001)))
+            self.precios[simbolo] = precio.quantize(Decimal("0.00000001"))
+            yield PriceTick(simbolo=simbolo, valor_usd=self.precios[simbolo], ts=time.time())
+            emitted += 1
+            if interval:
+                next_at += interval
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class PriceFeedIngestor:
+    """Consume una ``TickSource`` en un hilo y vuelca el último precio por símbolo cada ``window`` segundos."""
+
+    def __init__(self, engine: Engine, source: TickSource, window: float = 0.5):
+        self.engine = engine
+        self.source = source
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending: Dict[str, PriceTick] = {}
+        self._oldest: Optional[float] = None
+        self._stop = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+
+        self._started_at = 0.0
+        self.ticks = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_updated = 0
+        self.flush_errors = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+        self._lag_count = 0
+
+    def _read(self) -> None:
+        try:
+            for tick in self.source:
+                with self._lock:
+                    self.ticks += 1
+                    if self._oldest is None or tick.ts < self._oldest:
+                        self._oldest = tick.ts
+                    previous = self._pending.get(tick.simbolo)
+                    if previous is not None:
+                        self.coalesced += 1
+                        if previous.ts > tick.ts:
+                            continue
+                    self._pending[tick.simbolo] = tick
+                if self._stop.is_set():
+                    break
+        finally:
+            self._stop.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            oldest, self._oldest = self._oldest, None
+        if not batch:
+            return 0
+
+        rows = values(
+            column("simbolo", String),
+            column("valor_usd", DECIMAL(precision=18, scale=8)),
+            name="ticks",
+        ).data([(t.simbolo, t.valor_usd) for t in batch.values()])
+        stmt = (
+            update(Cryptomoneda)
+            .where(Cryptomoneda.simbolo == rows.c.simbolo)
+            .values(valor_usd=rows.c.valor_usd)
+            .returning(Cryptomoneda.id)
+        )
+        try:
+            with self.engine.begin() as conn:
+                ids = conn.execute(stmt).scalars().all()
+        except Exception:
+            with self._lock:
+                for simbolo, tick in batch.items():
+                    self._pending.setdefault(simbolo, tick)
+                if self._oldest is None or oldest < self._oldest:
+                    self._oldest = oldest
+            raise
+
+        # lag: desde el tick más antiguo de la ventana hasta que el UPDATE quedó confirmado
+        lag = max(time.time() - oldest, 0.0)
+        with self._lock:
+            self.flushes += 1
+            self.rows_updated += len(ids)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._lag_total += lag
+            self._lag_count += 1
+        return len(ids)
+
+    def start(self) -> None:
+        self._started_at = time.monotonic()
+        self._reader = threading.Thread(target=self._read, name="price-feed-reader", daemon=True)
+        self._reader.start()
+
+    def _safe_flush(self) -> None:
+        # un fallo transitorio no detiene la ingesta: el lote vuelve a pendientes y se reintenta
+        try:
+            self.flush()
+        except Exception:
+            with self._lock:
+                self.flush_errors += 1
+            logger.exception("Error aplicando ticks de precio; se reintenta en la siguiente ventana")
+
+    def run(self) -> None:
+        self.start()
+        try:
+            while not self._stop.wait(self.window):
+                self._safe_flush()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.source.close()
+        if self._reader is not None:
+            self._reader.join(timeout=self.window)
+        self._safe_flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            return {
+                "ticks": self.ticks,
+                "ticks_per_s": round(self.ticks / elapsed, 1) if elapsed else 0.0,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "rows_updated": self.rows_updated,
+                "flush_errors": self.flush_errors,
+                "pending": len(self._pending),
+                "lag_last_s": round(self.last_lag, 4),
+                "lag_avg_s": round(self._lag_total / self._lag_count, 4) if self._lag_count else 0.0,
+                "lag_max_s": round(self.max_lag, 4),
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta de ticks de precio")
+    parser.add_argument("--window", type=float, default=0.5, help="ventana de flush en segundos")
+    parser.add_argument("--report", type=float, default=5.0, help="intervalo de reporte en segundos")
+    sub = parser.add_subparsers(dest="fuente", required=True)
+
+    file_parser = sub.add_parser("file")
+    file_parser.add_argument("path")
+    file_parser.add_argument("--follow", action="store_true")
+
+    tcp_parser = sub.add_parser("tcp")
+    tcp_parser.add_argument("address", help="host:puerto")
+
+    sim_parser = sub.add_parser("simulate")
+    sim_parser.add_argument("--symbols", default="BTC,ETH")
+    sim_parser.add_argument("--rate", type=float, default=1000.0)
+    sim_parser.add_argument("--limit", type=int, default=None)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.fuente == "file":
+        source = FileTickSource(args.path, follow=args.follow)
+    elif args.fuente == "tcp":
+        host, _, port = args.address.rpartition(":")
+        source = SocketTickSource(host or "localhost", int(port))
+    else:
+        source = SimulatedTickSource(args.symbols.split(","), rate=args.rate, limit=args.limit)
+
+    from app.config.db import get_engine
+
+    ingestor = PriceFeedIngestor(get_engine(), source, window=args.window)
+
+    def report():
+        while not ingestor._stop.wait(args.report):
+            print(ingestor.stats(), flush=True)
+
+    threading.Thread(target=report, daemon=True).start()
+    try:
+        ingestor.run()
+    except KeyboardInterrupt:
+        pass
+    print(ingestor.stats(), flush=True)
+
+
+if __name__ == "__main__":
+    main()
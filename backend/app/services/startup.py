@@ -0,0 +1,126 @@
+"""Arranque de la aplicación: DDL, warm-up opcional y métricas de arranque.
+
+``warm_up`` llena el pool de conexiones, ejecuta una vez las consultas más
+usadas por las rutas para que SQLAlchemy guarde su forma compilada y, si el
+micro-cache de single-flight está activo, precarga las criptomonedas.
+"""
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import Session, SQLModel, select
+
+from app.models.item import Cryptomoneda, Transaction, User, Wallet
+from app.utils.singleflight import get_flight
+
+# marca de arranque del proceso, tomada al importar la aplicación
+BOOT_TIME = time.perf_counter()
+
+
+class StartupMetrics:
+    def __init__(self):
+        self.booted_at = datetime.utcnow()
+        self.create_all_s: Optional[float] = None
+        self.warmup_s: Optional[float] = None
+        self.ready_s: Optional[float] = None
+        self.first_request_s: Optional[float] = None
+        self.pool_connections = 0
+        self.warmed_statements = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "booted_at": self.booted_at,
+            "create_all_s": self.create_all_s,
+            "warmup_s": self.warmup_s,
+            "ready_s": self.ready_s,
+            "first_request_s": self.first_request_s,
+            "pool_connections": self.pool_connections,
+            "warmed_statements": self.warmed_statements,
+        }
+
+
+startup_metrics = StartupMetrics()
+
+
+def _elapsed(since: float) -> float:
+    return round(time.perf_counter() - since, 4)
+
+
+def create_tables(engine: Engine) -> None:
+    start = time.perf_counter()
+    SQLModel.metadata.create_all(engine)
+    startup_metrics.create_all_s = _elapsed(start)
+
+
+def _prefill_pool(engine: Engine) -> int:
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            conn.exec_driver_sql("SELECT 1")
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+def _hot_statements():
+    # mismas formas que usan las rutas; con un id que no existe no devuelven filas
+    yield select(Cryptomoneda)
+    yield select(Wallet).where(Wallet.usuario_id == -1)
+    yield select(Wallet).where(Wallet.usuario_id == -1, Wallet.cryptomoneda_id == -1)
+    yield select(Transaction).where(Transaction.usuario_id == -1)
+    yield select(User).where(User.email == "")
+    yield select(User).where(User.username == "")
+
+
+def warm_up(engine: Engine) -> None:
+    start = time.perf_counter()
+    configure_mappers()
+    startup_metrics.pool_connections = _prefill_pool(engine)
+
+    warmed = 0
+    with Session(engine) as db:
+        for model in (Cryptomoneda, User, Wallet, Transaction):
+            db.get(model, -1)
+            warmed += 1
+        for statement in _hot_statements():
+            db.exec(statement).all()
+            warmed += 1
+
+        criptomoneda_flight = get_flight("get_criptomoneda")
+        if criptomoneda_flight.ttl > 0:
+            for criptomoneda in db.exec(select(Cryptomoneda)).all():
+                criptomoneda_flight.prime(criptomoneda.id, criptomoneda)
+
+    startup_metrics.warmed_statements = warmed
+    startup_metrics.warmup_s = _elapsed(start)
+
+
+def mark_ready() -> None:
+    startup_metrics.ready_s = _elapsed(BOOT_TIME)
+
+
+class FirstRequestTimer:
+    """Anota el tiempo desde el arranque hasta que termina la primera petición HTTP.
+
+    Las sondas ``/health/*`` no cuentan: llegan siempre antes que el tráfico real.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._done = False
+
+    async def __call__(self, scope, receive, send):
+        if self._done or scope["type"] != "http" or scope["path"].startswith("/health/"):
+            return await self.app(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if not self._done:
+                self._done = True
+                startup_metrics.first_request_s = _elapsed(BOOT_TIME)
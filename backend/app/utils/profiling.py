@@ -0,0 +1,229 @@
+"""Perfilado bajo demanda de una sola petición.
+
+Una petición se perfila si trae la cabecera ``X-Profile`` firmada con
+``PROFILING_SECRET`` (ver ``sign_profile_request``) o si cae dentro de
+``PROFILING_SAMPLE_RATE``. Para esa petición se guarda un perfil cProfile del
+endpoint y las sentencias SQL con su duración; los últimos
+``PROFILING_BUFFER_SIZE`` perfiles quedan en memoria.
+
+cProfile sólo cubre el cuerpo del endpoint: dependencias, validación,
+serialización de la respuesta y middlewares quedan fuera. Su tiempo sí entra
+en ``duration_ms`` y las sentencias SQL que ejecuten sí se capturan. No se
+activa alrededor de toda la petición porque los endpoints síncronos corren en
+otro hilo y el bucle de eventos mezcla varias peticiones a la vez.
+
+Los listeners de SQL se registran una vez al importar el módulo; si la
+petición no se perfila, el middleware sólo lee una cabecera y los listeners
+vuelven en cuanto ven que no hay perfil activo.
+"""
+import cProfile
+import functools
+import hashlib
+import hmac
+import inspect
+import io
+import itertools
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.settings import PROFILING_BUFFER_SIZE
+
+PROFILE_HEADER = b"x-profile"
+MAX_SIGNATURE_AGE = 300
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_ids = itertools.count(1)
+
+
+def sign_profile_request(secret: str, method: str, path: str, ts: Optional[int] = None) -> str:
+    ts = int(time.time()) if ts is None else ts
+    signature = hmac.new(secret.encode(), f"{ts}:{method.upper()}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{ts}.{signature}"
+
+
+def verify_profile_signature(secret: str, method: str, path: str, value: str) -> bool:
+    ts = value.partition(".")[0]
+    if not ts.isdigit() or abs(time.time() - int(ts)) > MAX_SIGNATURE_AGE:
+        return False
+    expected = sign_profile_request(secret, method, path, int(ts))
+    return hmac.compare_digest(expected, value)
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = next(_ids)
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = datetime.utcnow()
+        self.status_code: Optional[int] = None
+        self.duration_ms = 0.0
+        self.profiler = cProfile.Profile()
+        self.sql: List[dict] = []
+        self.skipped = False
+
+    def stats_text(self, limit: int = 40) -> str:
+        out = io.StringIO()
+        try:
+            pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        except TypeError:
+            # el endpoint no llegó a ejecutarse (p. ej. 404 de enrutado o fallo de validación)
+            return ""
+        return out.getvalue()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 3),
+            "sql_count": len(self.sql),
+            "sql_ms": round(sum(q["duration_ms"] for q in self.sql), 3),
+            "profiler_skipped": self.skipped,
+        }
+
+    def detail(self) -> dict:
+        return {**self.summary(), "sql": self.sql, "profile": self.stats_text()}
+
+
+class ProfileStore:
+    def __init__(self, size: int):
+        self._profiles: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [p.summary() for p in reversed(self._profiles)]
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    starts = conn.info.get("profile_query_start")
+    if profile is None or not starts:
+        return
+    elapsed = (time.perf_counter() - starts.pop()) * 1000
+    profile.sql.append({"statement": statement, "duration_ms": round(elapsed, 3), "executemany": executemany})
+
+
+# registrar y quitar listeners en caliente compite con las sentencias que los recorren
+event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store: ProfileStore, secret: Optional[str] = None, sample_rate: float = 0.0):
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+
+    def _trigger(self, scope) -> Optional[str]:
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if verify_profile_signature(self.secret, scope["method"], scope["path"], value.decode("latin-1")):
+                        return "header"
+                    break
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        trigger = self._trigger(scope)
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", str(profile.id).encode())]
+            await send(message)
+
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            _current.reset(token)
+            self.store.add(profile)
+
+
+def _enable(profile: RequestProfile) -> bool:
+    try:
+        profile.profiler.enable()
+    except ValueError:
+        # desde Python 3.12 sólo puede haber un profiler activo a la vez en el proceso
+        profile.skipped = True
+        return False
+    return True
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    # include_router vuelve a construir la ruta con el endpoint ya envuelto
+    if getattr(endpoint, "_profiled", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or not _enable(profile):
+                return await endpoint(*args, **kwargs)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.profiler.disable()
+        async_wrapper._profiled = True
+        return async_wrapper
+
+    # los endpoints síncronos corren en el threadpool: el profiler se activa en ese hilo
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None or not _enable(profile):
+            return endpoint(*args, **kwargs)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profile.profiler.disable()
+    wrapper._profiled = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+
+profile_store = ProfileStore(PROFILING_BUFFER_SIZE)
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Agrupa lecturas concurrentes con la misma clave en una sola ejecución.
+
+    Las rutas son síncronas y corren en el threadpool de FastAPI, por eso la
+    coordinación se hace con hilos. Si ``ttl`` es mayor que cero, el último
+    resultado de cada clave se reutiliza durante ese número de segundos.
+
+    El estado es por proceso: ``forget()`` sólo limpia el worker que hizo la
+    escritura, así que con varios workers (o escrituras desde otro proceso) los
+    demás pueden servir un valor desfasado hasta ``ttl`` segundos.
+    """
+
+    def __init__(self, name: str, ttl: float = 0.0, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._requests = 0
+        self._executions = 0
+        self._collapsed = 0
+        self._cache_hits = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._requests += 1
+            if self.ttl > 0:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self._cache_hits += 1
+                    return cached[1]
+            call = self._calls.get(key)
+            if call is not None:
+                self._collapsed += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                # forget() pudo invalidar la clave mientras la consulta estaba en vuelo
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                    if self.ttl > 0 and call.error is None and call.result is not None:
+                        self._store(key, call.result)
+            call.event.set()
+        return call.result
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        if self.ttl > 0 and value is not None:
+            with self._lock:
+                self._store(key, value)
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+            self._cache.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        self._cache[key] = (now + self.ttl, value)
+        if len(self._cache) > self.max_entries:
+            for k in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+                del self._cache[k]
+            while len(self._cache) > self.max_entries:
+                del self._cache[next(iter(self._cache))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "ttl": self.ttl,
+                "requests": self._requests,
+                "executions": self._executions,
+                "collapsed": self._collapsed,
+                "cache_hits": self._cache_hits,
+                "in_flight": len(self._calls),
+                "cached": len(self._cache),
+            }
+
+
+_registry: Dict[str, SingleFlight] = {}
+
+
+def get_flight(name: str, ttl: Optional[float] = None) -> SingleFlight:
+    # sin ttl sólo se busca la instancia; el módulo dueño de la ruta es quien lo configura
+    flight = _registry.get(name)
+    if flight is None:
+        flight = _registry[name] = SingleFlight(name, ttl=ttl or 0.0)
+    elif ttl is not None:
+        flight.ttl = ttl
+    return flight
+
+
+def all_stats() -> List[dict]:
+    return [flight.stats() for flight in _registry.values()]
@@ -0,0 +1,116 @@
+"""Avalancha de lecturas idénticas contra ``GET /api/criptomonedas/{id}``.
+
+Monta ``criptomoneda_router`` con ``TestClient`` sobre una base SQLite temporal
+y cuenta, con un listener del engine, cuántas consultas a ``cryptomoneda``
+llegan realmente a la base de datos. ``--latency`` añade una espera por
+consulta para simular la ida y vuelta a PostgreSQL. Se compara el handler con
+single-flight y con la capa desactivada.
+
+    python -m benchmarks.singleflight_herd --threads 32 --rounds 20
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.item import Cryptomoneda
+from app.routes import criptomoneda
+from app.routes.deps.db_session import get_db
+from app.utils.singleflight import SingleFlight
+
+
+class _NoFlight:
+    def do(self, key, fn):
+        return fn()
+
+    def forget(self, key):
+        pass
+
+
+def _build(path: str, latency: float):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Cryptomoneda(nombre="Bitcoin", simbolo="BTC"))
+        db.commit()
+
+    counter = {"queries": 0}
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM cryptomoneda" in statement:
+            with lock:
+                counter["queries"] += 1
+            time.sleep(latency)
+
+    app = FastAPI()
+    app.include_router(criptomoneda.criptomoneda_router)
+
+    def override_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    return app, engine, counter
+
+
+def run(app, counter: dict, threads: int, rounds: int) -> dict:
+    counter["queries"] = 0
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in range(rounds):
+                statuses = list(pool.map(lambda _: client.get("/api/criptomonedas/1").status_code, range(threads)))
+                assert all(status == 200 for status in statuses), statuses
+        elapsed = time.perf_counter() - start
+
+    requests = threads * rounds
+    return {
+        "requests": requests,
+        "db_queries": counter["queries"],
+        "db_queries_per_s": round(counter["queries"] / elapsed, 1),
+        "requests_per_s": round(requests / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.005, help="segundos añadidos a cada consulta")
+    parser.add_argument("--ttl", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    original = criptomoneda.criptomoneda_flight
+    try:
+        app, engine, counter = _build(path, args.latency)
+
+        criptomoneda.criptomoneda_flight = _NoFlight()
+        baseline = run(app, counter, args.threads, args.rounds)
+
+        flight = SingleFlight("benchmark", ttl=args.ttl)
+        criptomoneda.criptomoneda_flight = flight
+        coalesced = run(app, counter, args.threads, args.rounds)
+        engine.dispose()
+    finally:
+        criptomoneda.criptomoneda_flight = original
+        os.remove(path)
+
+    print(f"sin single-flight: {baseline}")
+    print(f"con single-flight: {coalesced}")
+    print(f"estadísticas:      {flight.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Mide el tiempo hasta la primera petición de un worker recién arrancado.
+
+Lanza uvicorn como subproceso con ``DB_CREATE_ALL=false``, espera a que
+``/health/live`` responda (no toca la base de datos) y luego cronometra la
+primera petición a una ruta que consulta la base de datos. Así el worker "frío"
+no tiene ninguna conexión abierta ni consulta compilada antes de esa petición.
+Compara el arranque con y sin ``STARTUP_WARMUP``; el esquema debe existir ya.
+
+    python -m benchmarks.startup_time --runs 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            return resp.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+def measure(port: int, warmup: bool, path: str, timeout: float) -> dict:
+    env = {**os.environ, "DB_CREATE_ALL": "false", "STARTUP_WARMUP": "true" if warmup else "false"}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        # uvicorn sólo acepta conexiones cuando el lifespan (y el warm-up) terminó
+        while _get(f"{base}/health/live") != 200:
+            if proc.poll() is not None or time.perf_counter() - start > timeout:
+                raise RuntimeError("el servidor no llegó a estar listo")
+            time.sleep(0.01)
+        ready = time.perf_counter() - start
+
+        first = time.perf_counter()
+        status = _get(f"{base}{path}")
+        first_request = time.perf_counter() - first
+
+        second = time.perf_counter()
+        _get(f"{base}{path}")
+        second_request = time.perf_counter() - second
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return {
+        "warmup": warmup,
+        "ready_s": round(ready, 3),
+        "first_request_ms": round(first_request * 1000, 2),
+        "second_request_ms": round(second_request * 1000, 2),
+        "status": status,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--path", default="/api/criptomonedas/")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    for warmup in (False, True):
+        for _ in range(args.runs):
+            print(measure(args.port, warmup, args.path, args.timeout), flush=True)
+
+
+if __name__ == "__main__":
+    main()
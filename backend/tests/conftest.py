@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.item import Cryptomoneda, User, Wallet
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="ana@example.com", username="ana", hashed_password="x", first_name="Ana", last_name="Pérez")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def wallets(db, user):
+    cryptomoneda = Cryptomoneda(nombre="Bitcoin", simbolo="BTC")
+    db.add(cryptomoneda)
+    db.commit()
+    origen = Wallet(direccion_wallet="origen", usuario_id=user.id, cryptomoneda_id=cryptomoneda.id, balance=Decimal("0"))
+    destino = Wallet(direccion_wallet="destino", usuario_id=user.id, cryptomoneda_id=cryptomoneda.id, balance=Decimal("0"))
+    db.add(origen)
+    db.add(destino)
+    db.commit()
+    db.refresh(origen)
+    db.refresh(destino)
+    return origen, destino
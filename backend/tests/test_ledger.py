@@ -0,0 +1,263 @@
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.item import (
+    BalanceCheckpoint,
+    Cryptomoneda,
+    LedgerEntry,
+    LedgerEntryType,
+    LedgerOpening,
+    Transaction,
+    TransactionStatus,
+    TransactionType,
+    User,
+    Wallet,
+)
+from app.routes.deps.db_session import get_db
+from app.routes.transacciones import router as transacciones_router
+from app.routes.usuario import get_current_user
+from app.services import ledger
+
+
+def _transfer(db, user, origen, destino, cantidad, estado=TransactionStatus.Pending):
+    transaction = Transaction(
+        usuario_id=user.id,
+        cryptomoneda_id=origen.cryptomoneda_id,
+        wallet_origen_id=origen.id,
+        wallet_destino_id=destino.id,
+        tipo=TransactionType.Transfer,
+        estado=estado,
+        cantidad=Decimal(cantidad),
+    )
+    db.add(transaction)
+    db.commit()
+    db.refresh(transaction)
+    return transaction
+
+
+def _fund(db, wallet, cantidad):
+    ledger.append_entry(db, wallet.id, LedgerEntryType.Credit, Decimal(cantidad))
+    db.commit()
+
+
+def test_post_transaction_is_idempotent(db, user, wallets):
+    origen, destino = wallets
+    _fund(db, origen, "10")
+    transaction = _transfer(db, user, origen, destino, "4")
+
+    assert len(ledger.post_transaction(db, transaction)) == 2
+    assert ledger.post_transaction(db, transaction) == []
+    db.commit()
+
+    entries = db.exec(select(LedgerEntry).where(LedgerEntry.transaction_id == transaction.id)).all()
+    assert sorted(e.tipo for e in entries) == [LedgerEntryType.Credit, LedgerEntryType.Debit]
+    assert ledger.get_balance(db, origen.id).balance == Decimal("6")
+    assert ledger.get_balance(db, destino.id).balance == Decimal("4")
+    assert db.get(Wallet, origen.id).balance == Decimal("6")
+
+
+def test_debit_cannot_overdraw(db, user, wallets):
+    origen, destino = wallets
+    transaction = _transfer(db, user, origen, destino, "2.5")
+
+    with pytest.raises(ledger.LedgerError):
+        ledger.post_transaction(db, transaction)
+    db.rollback()
+    assert not ledger.has_entries(db, transaction_id=transaction.id)
+
+
+def test_get_balance_across_checkpoint(db, user, wallets, monkeypatch):
+    monkeypatch.setattr(ledger, "LEDGER_CHECKPOINT_INTERVAL", 3)
+    origen, _ = wallets
+
+    history = []
+    for cantidad in ["1", "2", "3", "4", "5"]:
+        _fund(db, origen, cantidad)
+        time.sleep(0.002)
+        history.append(datetime.utcnow())
+        time.sleep(0.002)
+
+    checkpoints = db.exec(select(BalanceCheckpoint).where(BalanceCheckpoint.wallet_id == origen.id)).all()
+    assert [c.balance for c in checkpoints] == [Decimal("6")]
+
+    assert ledger.get_balance(db, origen.id).balance == Decimal("15")
+    expected = [Decimal("1"), Decimal("3"), Decimal("6"), Decimal("10"), Decimal("15")]
+    assert [ledger.get_balance(db, origen.id, at).balance for at in history] == expected
+
+
+def test_ledger_rejects_updates_and_deletes(db, wallets):
+    origen, _ = wallets
+    _fund(db, origen, "1")
+    entry = db.exec(select(LedgerEntry)).first()
+
+    entry.cantidad = Decimal("100")
+    db.add(entry)
+    with pytest.raises(ledger.LedgerError):
+        db.commit()
+    db.rollback()
+
+    db.delete(entry)
+    with pytest.raises(ledger.LedgerError):
+        db.commit()
+    db.rollback()
+    assert db.exec(select(LedgerEntry)).first().cantidad == Decimal("1")
+
+
+def test_verify_wallets_reports_drift(engine, db, wallets, monkeypatch):
+    monkeypatch.setattr(ledger, "LEDGER_CHECKPOINT_INTERVAL", 2)
+    origen, destino = wallets
+    for _ in range(3):
+        _fund(db, origen, "1")
+    _fund(db, destino, "5")
+
+    assert ledger.verify_wallets(engine, chunk_size=1, workers=2)["drift"] == []
+
+    wallet = db.get(Wallet, origen.id)
+    wallet.balance = Decimal("10")
+    db.add(wallet)
+    db.commit()
+
+    result = ledger.verify_wallets(engine, chunk_size=1, workers=2)
+    assert result["wallets"] == 2
+    assert result["chunks"] == 2
+    assert [(d["wallet_id"], d["ledger"], d["checkpoint"], d["drift"]) for d in result["drift"]] == [
+        (origen.id, Decimal("3"), Decimal("3"), Decimal("7")),
+    ]
+
+
+def test_bootstrap_covers_balance_posted_before_it(engine, db, user, wallets):
+    origen, destino = wallets
+    origen.balance = Decimal("50")
+    db.add(origen)
+    db.commit()
+    ledger.post_transaction(db, _transfer(db, user, origen, destino, "20"))
+    db.commit()
+
+    assert ledger.bootstrap_opening_balances(engine) == 1
+    assert ledger.bootstrap_opening_balances(engine) == 0
+    assert ledger.verify_wallets(engine)["drift"] == []
+    with Session(engine) as fresh:
+        assert ledger.get_balance(fresh, origen.id).balance == Decimal("30")
+
+
+def test_bootstrap_opens_each_wallet_once(engine, db, wallets):
+    origen, _ = wallets
+    assert ledger.bootstrap_opening_balances(engine) == 0
+    assert len(db.exec(select(LedgerOpening)).all()) == 2
+
+    origen.balance = Decimal("999")
+    db.add(origen)
+    db.commit()
+    assert [d["wallet_id"] for d in ledger.verify_wallets(engine)["drift"]] == [origen.id]
+
+    assert ledger.bootstrap_opening_balances(engine) == 0
+    assert [d["drift"] for d in ledger.verify_wallets(engine)["drift"]] == [Decimal("999")]
+    assert not ledger.has_entries(db, wallet_id=origen.id)
+
+
+@pytest.fixture
+def client(engine, user):
+    app = FastAPI()
+    app.include_router(transacciones_router)
+
+    def override_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+def test_only_pending_to_completed_posts(client, db, user, wallets):
+    origen, destino = wallets
+    _fund(db, origen, "10")
+    transaction = _transfer(db, user, origen, destino, "3")
+
+    response = client.patch(f"/api/transacciones/{transaction.id}/estado", params={"nuevo_estado": "Completed"})
+    assert response.status_code == 200
+    assert ledger.has_entries(db, transaction_id=transaction.id)
+
+    for estado in ("Cancelled", "Pending"):
+        response = client.patch(f"/api/transacciones/{transaction.id}/estado", params={"nuevo_estado": estado})
+        assert response.status_code == 400
+        response = client.put(f"/api/transacciones/{transaction.id}", json={"estado": estado})
+        assert response.status_code == 400
+
+
+def test_updating_legacy_completed_transaction_does_not_post(client, db, user, wallets):
+    origen, destino = wallets
+    transaction = _transfer(db, user, origen, destino, "3", estado=TransactionStatus.Completed)
+
+    response = client.put(f"/api/transacciones/{transaction.id}", json={"hash_transaccion": "0xabc"})
+    assert response.status_code == 200
+    assert not ledger.has_entries(db, transaction_id=transaction.id)
+
+
+def _other_wallet(db, usuario_id, cryptomoneda_id, direccion):
+    wallet = Wallet(direccion_wallet=direccion, usuario_id=usuario_id, cryptomoneda_id=cryptomoneda_id, balance=Decimal("0"))
+    db.add(wallet)
+    db.commit()
+    db.refresh(wallet)
+    return wallet
+
+
+def test_transfer_without_origin_is_not_posted(client, db, user, wallets):
+    _, destino = wallets
+    transaction = Transaction(
+        usuario_id=user.id,
+        cryptomoneda_id=destino.cryptomoneda_id,
+        wallet_destino_id=destino.id,
+        tipo=TransactionType.Transfer,
+        cantidad=Decimal("5"),
+    )
+    db.add(transaction)
+    db.commit()
+
+    response = client.patch(f"/api/transacciones/{transaction.id}/estado", params={"nuevo_estado": "Completed"})
+    assert response.status_code == 400
+    assert not ledger.has_entries(db, wallet_id=destino.id)
+
+    payload = {"usuario_id": user.id, "cryptomoneda_id": destino.cryptomoneda_id, "wallet_destino_id": destino.id, "tipo": "Transfer", "cantidad": "5"}
+    assert client.post("/api/transacciones/", json=payload).status_code == 400
+
+
+def test_foreign_origin_wallet_is_rejected(client, db, user, wallets):
+    _, destino = wallets
+    otro = User(email="luis@example.com", username="luis", hashed_password="x", first_name="Luis", last_name="Gómez")
+    db.add(otro)
+    db.commit()
+    ajena = _other_wallet(db, otro.id, destino.cryptomoneda_id, "ajena")
+    _fund(db, ajena, "10")
+    transaction = _transfer(db, user, ajena, destino, "4")
+
+    with pytest.raises(ledger.LedgerError):
+        ledger.post_transaction(db, transaction)
+    db.rollback()
+    assert not ledger.has_entries(db, transaction_id=transaction.id)
+
+    payload = {"usuario_id": user.id, "cryptomoneda_id": destino.cryptomoneda_id, "wallet_origen_id": ajena.id, "wallet_destino_id": destino.id, "tipo": "Transfer", "cantidad": "4"}
+    assert client.post("/api/transacciones/", json=payload).status_code == 400
+
+
+def test_currency_mismatch_is_rejected(client, db, user, wallets):
+    origen, _ = wallets
+    ether = Cryptomoneda(nombre="Ethereum", simbolo="ETH")
+    db.add(ether)
+    db.commit()
+    destino = _other_wallet(db, user.id, ether.id, "eth")
+    _fund(db, origen, "10")
+    transaction = _transfer(db, user, origen, destino, "4")
+
+    response = client.patch(f"/api/transacciones/{transaction.id}/estado", params={"nuevo_estado": "Completed"})
+    assert response.status_code == 400
+    assert not ledger.has_entries(db, transaction_id=transaction.id)
+
+    payload = {"usuario_id": user.id, "cryptomoneda_id": origen.cryptomoneda_id, "wallet_origen_id": origen.id, "wallet_destino_id": destino.id, "tipo": "Transfer", "cantidad": "4"}
+    assert client.post("/api/transacciones/", json=payload).status_code == 400
@@ -0,0 +1,100 @@
+from decimal import Decimal
+
+import pytest
+
+from app.services.price_feed import PriceFeedIngestor, SimulatedTickSource, TickSource, parse_tick
+
+
+class _Result:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.ids
+
+
+class _FlakyEngine:
+    """Falla las primeras ``failures`` ejecuciones y luego devuelve un id por fila."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.executed = []
+
+    def begin(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("conexión perdida")
+        rows = stmt.compile().params
+        self.executed.append(rows)
+        return _Result(list(range(len(rows) // 2)))
+
+
+class _ListSource(TickSource):
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __iter__(self):
+        for line in self.lines:
+            tick = parse_tick(line)
+            if tick is not None:
+                yield tick
+
+
+def test_parse_tick_accepts_valid_lines():
+    tick = parse_tick("BTC, 67000.5, 1700000000.5")
+    assert tick.simbolo == "BTC"
+    assert tick.valor_usd == Decimal("67000.5")
+    assert tick.ts == 1700000000.5
+
+
+@pytest.mark.parametrize("line", [
+    "",
+    "# comentario",
+    "BTC",
+    "BTC,abc",
+    "BTC,NaN",
+    "BTC,Infinity",
+    "BTC,-1",
+    "BTC,0",
+    "BTC,1e400",
+    "BTC,10000000000",
+    "BTC,1,nan",
+])
+def test_parse_tick_rejects_invalid_lines(line):
+    assert parse_tick(line) is None
+
+
+def test_flush_coalesces_ticks_per_symbol():
+    engine = _FlakyEngine()
+    ingestor = PriceFeedIngestor(engine, _ListSource(["BTC,1,1", "BTC,3,3", "BTC,2,2", "ETH,5,1"]), window=0.01)
+    ingestor.run()
+
+    stats = ingestor.stats()
+    assert stats["ticks"] == 4
+    assert stats["coalesced"] == 2
+    assert stats["rows_updated"] == 2
+    assert sorted(v for v in engine.executed[0].values() if isinstance(v, Decimal)) == [Decimal("3"), Decimal("5")]
+
+
+def test_failed_flush_is_retried_on_next_window():
+    engine = _FlakyEngine(failures=2)
+    ingestor = PriceFeedIngestor(engine, SimulatedTickSource(["BTC", "ETH"], rate=1000, limit=100), window=0.01)
+    ingestor.run()
+
+    stats = ingestor.stats()
+    assert stats["flush_errors"] == 2
+    assert stats["flushes"] >= 1
+    assert stats["pending"] == 0
+    assert stats["rows_updated"] == 2 * stats["flushes"]
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.routes import admin
+from app.routes.deps.db_session import get_db
+from app.routes.wallet import router as wallet_router
+from app.utils.profiling import ProfileStore, ProfilingMiddleware, sign_profile_request
+
+SECRET = "firma"
+
+
+@pytest.fixture
+def store():
+    return ProfileStore(5)
+
+
+@pytest.fixture
+def client(engine, store, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "admin")
+    monkeypatch.setattr(admin, "profile_store", store)
+    app = FastAPI()
+    app.include_router(wallet_router)
+    app.include_router(admin.admin_router)
+    app.add_middleware(ProfilingMiddleware, store=store, secret=SECRET)
+
+    def override_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    return TestClient(app)
+
+
+def test_endpoints_are_wrapped_once(client):
+    routes = [route for route in client.app.routes if getattr(route, "path", "").startswith("/api/wallets")]
+    assert routes
+    for route in routes:
+        depth, call = 0, route.dependant.call
+        while hasattr(call, "__wrapped__"):
+            depth, call = depth + 1, call.__wrapped__
+        assert depth == 1, route.path
+
+
+def test_signed_request_is_profiled_with_sql(client, store, wallets):
+    origen, _ = wallets
+    path = f"/api/wallets/{origen.id}/balance"
+
+    assert client.get(path).status_code == 200
+    assert store.list() == []
+
+    response = client.get(path, headers={"X-Profile": sign_profile_request(SECRET, "GET", path)})
+    assert response.status_code == 200
+    summary = store.list()[0]
+    assert str(summary["id"]) == response.headers["x-profile-id"]
+    assert summary["sql_count"] >= 2
+    assert summary["profiler_skipped"] is False
+    assert "obtener_balance_wallet" in store.get(summary["id"]).stats_text()
+
+
+def test_bad_signature_is_not_profiled(client, store, wallets):
+    origen, _ = wallets
+    path = f"/api/wallets/{origen.id}"
+    signature = sign_profile_request("otra", "GET", path)
+    assert client.get(path, headers={"X-Profile": signature}).status_code == 200
+    assert store.list() == []
+
+
+@pytest.mark.parametrize("path", ["/api/admin/singleflight", "/api/admin/ledger/verify", "/api/admin/profiles"])
+def test_admin_routes_require_admin_token(client, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Token": SECRET}).status_code == 403
+
+
+def test_admin_routes_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    assert client.get("/api/admin/singleflight", headers={"X-Admin-Token": "admin"}).status_code == 404
+
+
+def test_ledger_verify_bounds_parameters(client, engine, wallets, monkeypatch):
+    monkeypatch.setattr(admin, "get_engine", lambda: engine)
+    headers = {"X-Admin-Token": "admin"}
+    assert client.get("/api/admin/ledger/verify", headers=headers).json()["wallets"] == 2
+    assert client.get("/api/admin/ledger/verify", params={"chunk_size": 0}, headers=headers).status_code == 422
+    assert client.get("/api/admin/ledger/verify", params={"workers": 0}, headers=headers).status_code == 422
+    assert client.get("/api/admin/ledger/verify", params={"workers": 100}, headers=headers).status_code == 422
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def _start_leader(flight, key, release, result="valor"):
+    started = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(2)
+        return result
+
+    out = {}
+
+    def run():
+        try:
+            out["value"] = flight.do(key, fetch)
+        except Exception as exc:
+            out["error"] = exc
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert started.wait(2)
+    return thread, out
+
+
+def _wait_collapsed(flight, n):
+    deadline = time.monotonic() + 2
+    while flight.stats()["collapsed"] < n:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    leader, leader_out = _start_leader(flight, 1, release)
+
+    results = []
+    followers = [threading.Thread(target=lambda: results.append(flight.do(1, lambda: "otro"))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    _wait_collapsed(flight, 5)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(2)
+
+    assert leader_out["value"] == "valor"
+    assert results == ["valor"] * 5
+    stats = flight.stats()
+    assert stats["requests"] == 6
+    assert stats["executions"] == 1
+    assert stats["collapsed"] == 5
+    assert stats["in_flight"] == 0
+
+
+def test_error_propagates_to_followers():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    error = RuntimeError("db caída")
+
+    def failing():
+        release.wait(2)
+        raise error
+
+    errors = []
+
+    def call():
+        try:
+            flight.do(1, failing)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    while flight.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_collapsed(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert errors == [error] * 3
+    assert flight.stats()["executions"] == 1
+    assert flight.stats()["cached"] == 0
+
+
+def test_ttl_reuses_result_until_expiry():
+    flight = SingleFlight("test", ttl=0.05)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert flight.do(1, fetch) == 1
+    assert flight.do(1, fetch) == 1
+    assert flight.stats()["cache_hits"] == 1
+    time.sleep(0.06)
+    assert flight.do(1, fetch) == 2
+    assert len(calls) == 2
+
+
+def test_none_results_are_not_cached():
+    flight = SingleFlight("test", ttl=10)
+    calls = []
+    flight.do(1, lambda: calls.append(1))
+    flight.do(1, lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_forget_during_flight_drops_stale_result():
+    flight = SingleFlight("test", ttl=10)
+    release = threading.Event()
+    leader, leader_out = _start_leader(flight, 1, release, result="viejo")
+
+    flight.forget(1)
+    # una lectura nueva tras la escritura no se une a la consulta antigua
+    assert flight.do(1, lambda: "nuevo") == "nuevo"
+    release.set()
+    leader.join(2)
+
+    assert leader_out["value"] == "viejo"
+    assert flight.do(1, lambda: pytest.fail("debía venir del cache")) == "nuevo"
+    assert flight.stats()["executions"] == 2
@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes.health import health_router
+from app.services import startup
+
+
+def test_first_request_ignores_health_probes(monkeypatch):
+    metrics = startup.StartupMetrics()
+    monkeypatch.setattr(startup, "startup_metrics", metrics)
+
+    app = FastAPI()
+    app.include_router(health_router)
+    app.add_api_route("/api/ping", lambda: {"ok": True})
+    app.add_middleware(startup.FirstRequestTimer)
+    client = TestClient(app)
+
+    assert client.get("/health/live").status_code == 200
+    assert client.get("/health/ready").status_code == 503
+    assert metrics.first_request_s is None
+
+    assert client.get("/api/ping").status_code == 200
+    first = metrics.first_request_s
+    assert first is not None
+    client.get("/api/ping")
+    assert metrics.first_request_s == first